@@ -2,47 +2,79 @@
 from __future__ import annotations
 
 import logging
-from typing import List
+from functools import lru_cache
+from typing import TYPE_CHECKING, List
 
 from fastapi import APIRouter, Depends, HTTPException
-from openai import OpenAI
+from fastapi.concurrency import run_in_threadpool
 
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.singleflight import AsyncSingleFlight, CoalescingOverflowError
 from app.models.schemas import ChatRequest, ChatResponse, ChatResponseSource
 from app.rag.embeddings import EmbeddingClient
+from app.rag.prompting import PromptBuilder
 from app.rag.retrieval import Retriever
 from app.rag.vectorstore import VectorStore
 from app.mcp.github_tools import sync_github_repo
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
 router = APIRouter(prefix="/api", tags=["chat"])
 logger = logging.getLogger(__name__)
+prompt_builder = PromptBuilder()
+_chat_flight = AsyncSingleFlight("chat", max_waiters=settings.coalesce_max_waiters)
+
+
+@lru_cache()
+def _llm_client() -> OpenAI:
+    """Return a shared OpenAI client so connections are reused across requests."""
+
+    from openai import OpenAI
+
+    return OpenAI(
+        api_key=settings.openai_api_key,
+        base_url=settings.openai_api_base,
+        timeout=settings.llm_timeout,
+        max_retries=settings.llm_max_retries,
+    )
+
+
+def _cached_tokens(usage) -> int:
+    # Older SDKs (the pinned openai==1.30.1) keep `prompt_tokens_details` as an
+    # untyped extra field, i.e. a plain dict; newer ones return a model.
+    details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        return details.get("cached_tokens") or 0
+    return getattr(details, "cached_tokens", None) or 0
+
+
+def _record_usage(usage) -> None:
+    if usage is None:
+        return
+    metrics.incr("llm.prompt_tokens", usage.prompt_tokens or 0)
+    metrics.incr("llm.completion_tokens", usage.completion_tokens or 0)
+    cached = _cached_tokens(usage)
+    metrics.incr("llm.cached_prompt_tokens", cached)
+    logger.info("LLM usage: prompt=%s cached=%s", usage.prompt_tokens, cached)
 
 
 def _llm_generate(question: str, context: str) -> str:
     if not settings.openai_api_key:
         raise HTTPException(status_code=500, detail="OPENAI_API_KEY not configured")
-    client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_api_base)
-    system_prompt = (
-        "You are Company Knowledge Copilot. Answer with only the provided context."
-        " Cite sources inline using (Source N). If unsure, say you do not know."
-    )
-    user_prompt = f"Context:\n{context}\n\nQuestion: {question}\nProvide a concise answer with citations."
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
+    resp = _llm_client().chat.completions.create(
+        model=settings.chat_model,
+        messages=prompt_builder.build_messages(question, context),
         temperature=0.1,
+        max_tokens=settings.chat_max_tokens,
     )
+    metrics.incr("llm.requests")
+    _record_usage(resp.usage)
     return resp.choices[0].message.content or ""
 
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(
-    payload: ChatRequest,
-    store: VectorStore = Depends(VectorStore),
-):
+def _answer(payload: ChatRequest, store: VectorStore) -> ChatResponse:
     retriever = Retriever(store)
     embedder = EmbeddingClient()
 
@@ -52,11 +84,14 @@ async def chat(
 
     top_k = payload.top_k or settings.top_k
     docs = retriever.fetch(payload.message, k=top_k, source_filter=payload.source_type)
-    context = retriever.build_context(docs, max_chars=settings.max_context_chars)
+    selected = retriever.select_context(docs, max_chars=settings.max_context_chars)
+    ordered = prompt_builder.order(selected)
+    context = prompt_builder.build_context(ordered)
     answer = _llm_generate(payload.message, context)
 
+    # Sources follow the context order so "(Source N)" citations match sources[N - 1].
     sources: List[ChatResponseSource] = []
-    for idx, doc in enumerate(docs, start=1):
+    for idx, doc in enumerate(ordered, start=1):
         name = doc.get("file_name") or doc.get("url") or f"Source {idx}"
         snippet = doc.get("text", "")[:280]
         sources.append(
@@ -68,3 +103,16 @@ async def chat(
         )
 
     return ChatResponse(answer=answer, sources=sources)
+
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat(
+    payload: ChatRequest,
+    store: VectorStore = Depends(VectorStore),
+):
+    # Identical concurrent questions share one retrieval + generation run.
+    key = (payload.message, payload.source_type, payload.top_k, payload.enable_mcp)
+    try:
+        return await _chat_flight.do(key, lambda: run_in_threadpool(_answer, payload, store))
+    except CoalescingOverflowError:
+        raise HTTPException(status_code=503, detail="Too many identical requests in flight")
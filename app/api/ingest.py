@@ -12,15 +12,12 @@ from fastapi import APIRouter, File, UploadFile
 from fastapi import HTTPException
 from fastapi import Depends
 from fastapi import BackgroundTasks
-from bs4 import BeautifulSoup
-from pypdf import PdfReader
-import docx2txt
 
 from app.core.config import settings
 from app.models.schemas import IngestResponse, IngestURLRequest, SourceMetadata
 from app.rag.chunking import chunk_documents
 from app.rag.embeddings import EmbeddingClient
-from app.rag.vectorstore import VectorStore
+from app.rag.vectorstore import VectorStore, make_source_id
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/ingest", tags=["ingest"])
@@ -36,11 +33,15 @@ def _parse_upload(file: UploadFile) -> Tuple[str, str]:
         text = content.decode("utf-8", errors="ignore")
         content_type = "text"
     elif ext in {".pdf"}:
+        from pypdf import PdfReader
+
         pdf = PdfReader(io.BytesIO(content))
         pages = [page.extract_text() or "" for page in pdf.pages]
         text = "\n".join(pages)
         content_type = "pdf"
     elif ext in {".docx"}:
+        import docx2txt
+
         with io.BytesIO(content) as buf:
             text = docx2txt.process(buf)
         content_type = "docx"
@@ -51,12 +52,9 @@ def _parse_upload(file: UploadFile) -> Tuple[str, str]:
     return text, content_type
 
 
-def _chunk_and_store(
-    texts: List[str],
-    metadata: List[SourceMetadata],
-    store: VectorStore,
-    embedder: EmbeddingClient,
-) -> int:
+def _prepare_chunks(
+    texts: List[str], metadata: List[SourceMetadata]
+) -> Tuple[List[str], List[dict]]:
     all_chunks: List[str] = []
     metadatas: List[dict] = []
     for text, meta in zip(texts, metadata):
@@ -65,23 +63,53 @@ def _chunk_and_store(
         )
         if not doc_chunks:
             continue
+        source_id = meta.source_id or make_source_id(
+            meta.source_type, meta.file_name or meta.url or ""
+        )
         all_chunks.extend(doc_chunks)
         metadatas.extend(
             [
                 {
-                    "source_type": meta.source_type,
-                    "file_name": meta.file_name,
-                    "url": meta.url,
-                    "content_type": meta.content_type,
-                    "created_at": meta.created_at.isoformat(),
+                    key: value
+                    for key, value in {
+                        "source_id": source_id,
+                        "source_type": meta.source_type,
+                        "file_name": meta.file_name,
+                        "url": meta.url,
+                        "content_type": meta.content_type,
+                        "created_at": meta.created_at.isoformat(),
+                    }.items()
+                    # Chroma rejects None metadata values.
+                    if value is not None
                 }
                 for _ in doc_chunks
             ]
         )
+    return all_chunks, metadatas
+
+
+def _chunk_and_store(
+    texts: List[str],
+    metadata: List[SourceMetadata],
+    store: VectorStore,
+    embedder: EmbeddingClient,
+) -> int:
+    """Embed and index documents, replacing chunks already stored for the same sources.
+
+    The new chunks are embedded and added before the old ones are deleted, so a
+    failure at any step leaves the previous version of a source in place.
+    """
+
+    all_chunks, metadatas = _prepare_chunks(texts, metadata)
     if not all_chunks:
         return 0
     embeddings = embedder.embed(all_chunks)
-    store.add_texts(all_chunks, metadatas=metadatas, embeddings=embeddings)
+    store.replace_sources(
+        [meta["source_id"] for meta in metadatas],
+        all_chunks,
+        metadatas=metadatas,
+        embeddings=embeddings,
+    )
     return len(all_chunks)
 
 
@@ -91,6 +119,8 @@ async def ingest_files(
     files: List[UploadFile] = File(...),
     store: VectorStore = Depends(VectorStore),
 ):
+    """Ingest uploads; re-uploading a file name replaces that file's earlier chunks."""
+
     embedder = EmbeddingClient()
     texts: List[str] = []
     metadatas: List[SourceMetadata] = []
@@ -99,6 +129,7 @@ async def ingest_files(
         texts.append(text)
         metadatas.append(
             SourceMetadata(
+                source_id=make_source_id("file", file.filename or ""),
                 source_type="file",
                 file_name=file.filename,
                 content_type=content_type,
@@ -113,6 +144,8 @@ async def ingest_files(
 
 
 async def _fetch_url(url: str) -> str:
+    from bs4 import BeautifulSoup
+
     async with httpx.AsyncClient(timeout=15) as client:
         resp = await client.get(url)
         resp.raise_for_status()
@@ -134,6 +167,7 @@ async def ingest_urls(
         texts.append(content)
         metadatas.append(
             SourceMetadata(
+                source_id=make_source_id("url", url),
                 source_type="url",
                 url=url,
                 content_type="html",
@@ -1,15 +1,26 @@
-"""Endpoints for listing indexed sources."""
+"""Endpoints for listing, deleting and re-indexing indexed sources."""
 from __future__ import annotations
 
+import logging
 from collections import Counter
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
-from app.models.schemas import SourceListItem
+from app.api.ingest import _chunk_and_store, _fetch_url
+from app.mcp.client import MCPClient
+from app.models.schemas import (
+    SourceDeleteResponse,
+    SourceListItem,
+    SourceMetadata,
+    SourceReindexResponse,
+)
+from app.rag.embeddings import EmbeddingClient
 from app.rag.vectorstore import VectorStore
 
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["sources"])
 
 
@@ -21,17 +32,87 @@ async def list_sources(store: VectorStore = Depends(VectorStore)) -> List[Source
     created_lookup = {}
     for meta in metadatas:
         name = meta.get("file_name") or meta.get("url") or "unknown"
-        key = (name, meta.get("source_type", "unknown"))
+        key = (meta.get("source_id"), name, meta.get("source_type", "unknown"))
         counter[key] += 1
         created_lookup.setdefault(key, meta.get("created_at"))
-    for (name, source_type), count in counter.items():
-        created_raw = created_lookup.get((name, source_type))
+    for (source_id, name, source_type), count in counter.items():
+        created_raw = created_lookup.get((source_id, name, source_type))
         created = datetime.fromisoformat(created_raw) if created_raw else datetime.utcnow()
         items.append(
             SourceListItem(
+                source_id=source_id,
                 name=f"{name} ({count} chunks)",
                 source_type=source_type,
                 created_at=created,
             )
         )
     return items
+
+
+@router.delete("/sources/{source_id}", response_model=SourceDeleteResponse)
+async def delete_source(
+    source_id: str,
+    store: VectorStore = Depends(VectorStore),
+) -> SourceDeleteResponse:
+    deleted = await run_in_threadpool(store.delete_source, source_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Unknown source: {source_id}")
+    logger.info("Deleted %s chunks for source %s", deleted, source_id)
+    return SourceDeleteResponse(source_id=source_id, deleted=deleted)
+
+
+@router.post("/sources/{source_id}/reindex", response_model=SourceReindexResponse)
+async def reindex_source(
+    source_id: str,
+    background_tasks: BackgroundTasks,
+    store: VectorStore = Depends(VectorStore),
+) -> SourceReindexResponse:
+    documents, metadatas = await run_in_threadpool(store.get_source, source_id)
+    if not documents:
+        raise HTTPException(status_code=404, detail=f"Unknown source: {source_id}")
+    embedder = EmbeddingClient()
+    first = metadatas[0] if metadatas else {}
+
+    def reembed() -> None:
+        embeddings = embedder.embed(documents)
+        store.replace_sources([source_id], documents, metadatas=metadatas, embeddings=embeddings)
+
+    # URLs are fetched again and MCP files re-read from the mirror; uploads are
+    # re-embedded from their stored chunks since the original file is not retained.
+    # Either way the new chunks are added before the old ones are deleted.
+    if first.get("source_type") == "url" and first.get("url"):
+        meta = SourceMetadata(
+            source_id=source_id,
+            source_type="url",
+            url=first["url"],
+            content_type=first.get("content_type") or "html",
+        )
+
+        async def task() -> None:
+            content = await _fetch_url(meta.url)
+            await run_in_threadpool(_chunk_and_store, [content], [meta], store, embedder)
+
+    elif first.get("source_type") == "mcp-github" and first.get("file_name"):
+        meta = SourceMetadata(
+            source_id=source_id,
+            source_type="mcp-github",
+            file_name=first["file_name"],
+            url=first.get("url"),
+            content_type=first.get("content_type") or "markdown",
+        )
+
+        def task() -> None:
+            content = MCPClient().read_asset(meta.file_name)
+            if content is None:
+                logger.info("MCP asset %s missing from mirror; re-embedding stored chunks", meta.file_name)
+                reembed()
+            else:
+                _chunk_and_store([content], [meta], store, embedder)
+
+    else:
+
+        def task() -> None:
+            reembed()
+
+    background_tasks.add_task(task)
+    return SourceReindexResponse(source_id=source_id, chunks=len(documents), status="scheduled")
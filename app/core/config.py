@@ -17,11 +17,30 @@ class Settings(BaseSettings):
 
     allowed_origins: List[str] = Field(default_factory=lambda: ["*"])
     mcp_server_config: Optional[str] = Field(default=None, env="MCP_SERVER_CONFIG")
+    mcp_include_globs: List[str] = Field(default_factory=lambda: ["*.md", "*.txt"])
+    mcp_exclude_globs: List[str] = Field(default_factory=lambda: [".git", "node_modules"])
+    mcp_max_file_bytes: int = Field(default=2_000_000, env="MCP_MAX_FILE_BYTES")
+    mcp_read_workers: int = Field(default=8, env="MCP_READ_WORKERS")
 
     chunk_size: int = Field(default=1000)
     chunk_overlap: int = Field(default=200)
     top_k: int = Field(default=4)
     max_context_chars: int = Field(default=6000)
+    embed_batch_size: int = Field(default=256, env="EMBED_BATCH_SIZE")
+    chat_model: str = Field(default="gpt-4o-mini", env="CHAT_MODEL")
+    chat_max_tokens: int = Field(default=512, env="CHAT_MAX_TOKENS")
+    llm_timeout: float = Field(default=30.0, env="LLM_TIMEOUT")
+    llm_max_retries: int = Field(default=2, env="LLM_MAX_RETRIES")
+    coalesce_max_waiters: int = Field(default=256, env="COALESCE_MAX_WAITERS")
+    prewarm_index: bool = Field(default=True, env="PREWARM_INDEX")
+    retrieval_cache_size: int = Field(default=1024, env="RETRIEVAL_CACHE_SIZE")
+    retrieval_cache_ttl: float = Field(default=60.0, env="RETRIEVAL_CACHE_TTL")
+    retrieval_generation_check_interval: float = Field(
+        default=1.0, env="RETRIEVAL_GENERATION_CHECK_INTERVAL"
+    )
+    delete_batch_size: int = Field(default=500, env="DELETE_BATCH_SIZE")
+    index_maintenance_interval: float = Field(default=300.0, env="INDEX_MAINTENANCE_INTERVAL")
+    index_maintenance_min_deletes: int = Field(default=1000, env="INDEX_MAINTENANCE_MIN_DELETES")
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,29 @@
+"""In-process counters for operational metrics."""
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import Dict
+
+
+class Metrics:
+    """Thread-safe monotonic counters exposed via the `/metrics` endpoint."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Counter = Counter()
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,116 @@
+"""Single-flight deduplication of identical in-flight calls.
+
+Concurrent callers that present the same key share one execution and all receive
+its result (or exception). Each key admits a bounded number of waiters so a burst
+of duplicates cannot pile up without limit.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+
+class CoalescingOverflowError(RuntimeError):
+    """Raised when a key already has the maximum number of waiters."""
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 1  # the leader executing the call
+
+
+class SingleFlight:
+    """Thread-based single-flight for blocking callables."""
+
+    def __init__(self, name: str, *, max_waiters: int = 256) -> None:
+        self.name = name
+        self.max_waiters = max_waiters
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            elif call.waiters >= self.max_waiters:
+                raise CoalescingOverflowError(f"{self.name}: too many waiters for one key")
+            else:
+                call.waiters += 1
+
+        if not leader:
+            metrics.incr(f"{self.name}.coalesced")
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+
+class _AsyncCall:
+    def __init__(self, task: "asyncio.Future[Any]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """Event-loop single-flight for coroutines.
+
+    The shared execution runs as its own task; a cancelled waiter only detaches
+    itself, and the task is cancelled once no waiters remain.
+    """
+
+    def __init__(self, name: str, *, max_waiters: int = 256) -> None:
+        self.name = name
+        self.max_waiters = max_waiters
+        self._calls: Dict[Hashable, _AsyncCall] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _AsyncCall(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task, call=call: self._finish(key, call, task))
+        elif call.waiters >= self.max_waiters:
+            raise CoalescingOverflowError(f"{self.name}: too many waiters for one key")
+        else:
+            metrics.incr(f"{self.name}.coalesced")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Detach before cancelling so a caller arriving before the done
+                # callback runs starts a fresh execution instead of joining this one.
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call.task.cancel()
+
+    def _finish(self, key: Hashable, call: _AsyncCall, task: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away.
+            task.exception()
@@ -1,18 +1,68 @@
 """FastAPI application entrypoint."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import ingest, chat, sources
 from app.core.config import settings
+from app.core.metrics import metrics
 from app.core.logging import configure_logging
 
 configure_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Company Knowledge Copilot", version="0.1.0")
+
+def _prewarm_index() -> None:
+    """Open the vector store, migrate legacy chunks and load the query path."""
+
+    try:
+        from app.rag.vectorstore import VectorStore
+
+        store = VectorStore()
+        backfilled = store.backfill_source_ids()
+        if backfilled:
+            logger.info("Assigned source ids to %s legacy chunks", backfilled)
+        if store.collection.count():
+            # The first query loads the collection's embedding function.
+            store.collection.query(query_texts=["warmup"], n_results=1)
+        import openai  # noqa: F401
+    except Exception as exc:  # pragma: no cover - best effort
+        logger.warning("Index pre-warm failed: %s", exc)
+    else:
+        logger.info("Index pre-warm complete")
+
+
+async def _index_maintenance_loop() -> None:
+    """Periodically compact collections once enough deletes have accumulated."""
+
+    from app.rag.vectorstore import maintain_indexes
+
+    while True:
+        await asyncio.sleep(settings.index_maintenance_interval)
+        await run_in_threadpool(maintain_indexes)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    if settings.prewarm_index:
+        # Do not block readiness: /health answers while the index warms up.
+        threading.Thread(target=_prewarm_index, name="index-prewarm", daemon=True).start()
+    maintenance = asyncio.create_task(_index_maintenance_loop())
+    try:
+        yield
+    finally:
+        maintenance.cancel()
+
+
+app = FastAPI(title="Company Knowledge Copilot", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,3 +80,8 @@ app.include_router(sources.router)
 @app.get("/health")
 async def health() -> dict:
     return {"status": "ok"}
+
+
+@app.get("/metrics")
+async def get_metrics() -> dict:
+    return metrics.snapshot()
@@ -7,40 +7,141 @@ project we treat `MCP_SERVER_CONFIG` as a path to a folder containing synced ass
 from __future__ import annotations
 
 import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from fnmatch import fnmatch
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+def _matches(rel_path: str, name: str, patterns: Iterable[str]) -> bool:
+    rel_path, name = rel_path.lower(), name.lower()
+    return any(fnmatch(name, pat.lower()) or fnmatch(rel_path, pat.lower()) for pat in patterns)
+
+
 class MCPClient:
     """Minimal file-backed MCP client."""
 
-    def __init__(self, config_path: str | None = None) -> None:
+    def __init__(
+        self,
+        config_path: str | None = None,
+        *,
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        max_file_bytes: Optional[int] = None,
+        read_workers: Optional[int] = None,
+    ) -> None:
         path = config_path or settings.mcp_server_config
         self.config_path = Path(path) if path else None
+        self.include = list(include if include is not None else settings.mcp_include_globs)
+        self.exclude = list(exclude if exclude is not None else settings.mcp_exclude_globs)
+        self.max_file_bytes = max_file_bytes if max_file_bytes is not None else settings.mcp_max_file_bytes
+        self.read_workers = max(1, read_workers or settings.mcp_read_workers)
         if not self.config_path:
             logger.warning("MCP server config not provided; MCP features are disabled")
 
-    def list_assets(self) -> List[Path]:
+    def iter_assets(self) -> Iterator[Path]:
+        """Walk the mirror with `os.scandir`, yielding files that pass the filters.
+
+        Excluded directories are pruned rather than walked, and files larger than
+        `max_file_bytes` are skipped.
+        """
+
         if not self.config_path or not self.config_path.exists():
-            return []
-        return [p for p in self.config_path.rglob("*") if p.is_file()]
+            return
+        root = str(self.config_path)
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError as exc:
+                logger.warning("Cannot scan MCP directory %s: %s", directory, exc)
+                continue
+            with entries:
+                for entry in entries:
+                    rel_path = os.path.relpath(entry.path, root).replace(os.sep, "/")
+                    if _matches(rel_path, entry.name, self.exclude):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                        if not entry.is_file() or not _matches(rel_path, entry.name, self.include):
+                            continue
+                        if self.max_file_bytes and entry.stat().st_size > self.max_file_bytes:
+                            logger.info("Skipping oversized MCP asset %s", entry.path)
+                            continue
+                    except OSError as exc:
+                        logger.warning("Cannot stat MCP asset %s: %s", entry.path, exc)
+                        continue
+                    yield Path(entry.path)
+
+    def list_assets(self) -> List[Path]:
+        return list(self.iter_assets())
+
+    def _read_asset(self, path: Path) -> Optional[Tuple[str, str]]:
+        try:
+            name = path.relative_to(self.config_path).as_posix() if self.config_path else path.name
+            return name, path.read_text(encoding="utf-8")
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.error("Failed reading MCP asset %s: %s", path, exc)
+            return None
+
+    def read_asset(self, rel_path: str) -> Optional[str]:
+        """Return the current content of a mirror file, or None if it is unavailable.
+
+        `rel_path` is the path relative to the mirror root that sync stores as
+        `file_name`; paths escaping the mirror are refused.
+        """
+
+        if not self.config_path:
+            return None
+        root = self.config_path.resolve()
+        path = (root / rel_path).resolve()
+        if root not in path.parents or not path.is_file():
+            return None
+        asset = self._read_asset(path)
+        return asset[1] if asset else None
+
+    def iter_markdown_assets(self) -> Iterator[Tuple[str, str]]:
+        """Yield (relative path, content) pairs as they are read by a bounded thread pool.
+
+        At most `2 * read_workers` reads are in flight, so memory stays bounded
+        regardless of mirror size and consumers can start chunking immediately.
+        """
+
+        max_pending = self.read_workers * 2
+        with ThreadPoolExecutor(max_workers=self.read_workers, thread_name_prefix="mcp-read") as pool:
+            pending: Set[Future] = set()
+            for path in self.iter_assets():
+                pending.add(pool.submit(self._read_asset, path))
+                if len(pending) < max_pending:
+                    continue
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    asset = future.result()
+                    if asset is not None:
+                        yield asset
+            for future in as_completed(pending):
+                asset = future.result()
+                if asset is not None:
+                    yield asset
 
     def fetch_markdown_assets(self) -> List[Tuple[str, str]]:
         """Return markdown/text assets to feed into the ingest pipeline."""
 
-        assets: List[Tuple[str, str]] = []
-        for path in self.list_assets():
-            if path.suffix.lower() not in {".md", ".txt"}:
-                continue
-            try:
-                assets.append((path.name, path.read_text(encoding="utf-8")))
-            except Exception as exc:  # pragma: no cover - defensive
-                logger.error("Failed reading MCP asset %s: %s", path, exc)
-        return assets
+        return list(self.iter_markdown_assets())
+
+    def iter_github_repo(self, repo_url: str) -> Iterator[Tuple[str, str]]:
+        """Streaming variant of `sync_github_repo`."""
+
+        logger.info("Syncing repository via MCP mirror: %s", repo_url)
+        return self.iter_markdown_assets()
 
     def sync_github_repo(self, repo_url: str) -> List[Tuple[str, str]]:
         """Placeholder GitHub sync using local MCP mirror.
@@ -50,5 +151,4 @@ class MCPClient:
         flow stays consistent for testing/demo purposes.
         """
 
-        logger.info("Syncing repository via MCP mirror: %s", repo_url)
-        return self.fetch_markdown_assets()
+        return list(self.iter_github_repo(repo_url))
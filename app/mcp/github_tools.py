@@ -2,30 +2,52 @@
 from __future__ import annotations
 
 import logging
-from typing import List
+from typing import List, Set
 
 from app.core.config import settings
 from app.mcp.client import MCPClient
 from app.models.schemas import SourceMetadata
 from app.rag.chunking import chunk_documents
 from app.rag.embeddings import EmbeddingClient
-from app.rag.vectorstore import VectorStore
+from app.rag.vectorstore import VectorStore, make_source_id
 
 logger = logging.getLogger(__name__)
 
 
+def _store_batch(
+    chunks: List[str],
+    metadatas: List[dict],
+    store: VectorStore,
+    embedder: EmbeddingClient,
+    replaced: Set[str],
+) -> None:
+    embeddings = embedder.embed(chunks)
+    # A re-synced file replaces its previous chunks; a file spanning several batches
+    # is only replaced with its first batch, later batches are plain additions.
+    fresh = [
+        source_id
+        for source_id in dict.fromkeys(meta["source_id"] for meta in metadatas)
+        if source_id not in replaced
+    ]
+    store.replace_sources(fresh, chunks, metadatas=metadatas, embeddings=embeddings)
+    replaced.update(fresh)
+
+
 def sync_github_repo(repo_url: str, store: VectorStore, embedder: EmbeddingClient) -> int:
-    """Fetch docs from MCP GitHub server mirror and ingest into the vector DB."""
+    """Fetch docs from MCP GitHub server mirror and ingest into the vector DB.
 
-    client = MCPClient()
-    assets = client.sync_github_repo(repo_url)
-    if not assets:
-        logger.warning("No MCP assets found for repo %s", repo_url)
-        return 0
+    Assets are chunked as they are read and embedded in batches of
+    `settings.embed_batch_size`, so reading, embedding and indexing overlap.
+    """
 
+    client = MCPClient()
     chunks: List[str] = []
     metadatas: List[dict] = []
-    for name, content in assets:
+    replaced: Set[str] = set()
+    total = 0
+    assets = 0
+    for rel_path, content in client.iter_github_repo(repo_url):
+        assets += 1
         doc_chunks = chunk_documents(
             [content], chunk_size=settings.chunk_size, chunk_overlap=settings.chunk_overlap
         )
@@ -33,17 +55,27 @@ def sync_github_repo(repo_url: str, store: VectorStore, embedder: EmbeddingClien
         metadatas.extend(
             [
                 {
+                    "source_id": make_source_id("mcp-github", f"{repo_url}/{rel_path}"),
                     "source_type": "mcp-github",
-                    "file_name": name,
+                    "file_name": rel_path,
                     "url": repo_url,
                     "content_type": "markdown",
                 }
                 for _ in doc_chunks
             ]
         )
-    if not chunks:
+        # Flush full slices so no embedding request exceeds the configured batch size,
+        # even when a single large file produces many chunks.
+        batch_size = settings.embed_batch_size
+        while len(chunks) >= batch_size:
+            _store_batch(chunks[:batch_size], metadatas[:batch_size], store, embedder, replaced)
+            total += batch_size
+            chunks, metadatas = chunks[batch_size:], metadatas[batch_size:]
+    if not assets:
+        logger.warning("No MCP assets found for repo %s", repo_url)
         return 0
-    embeddings = embedder.embed(chunks)
-    store.add_texts(chunks, metadatas=metadatas, embeddings=embeddings)
-    logger.info("Ingested %s chunks from MCP GitHub", len(chunks))
-    return len(chunks)
+    if chunks:
+        _store_batch(chunks, metadatas, store, embedder, replaced)
+        total += len(chunks)
+    logger.info("Ingested %s chunks from MCP GitHub", total)
+    return total
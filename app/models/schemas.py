@@ -40,6 +40,7 @@ class ChatResponse(BaseModel):
 
 
 class SourceListItem(BaseModel):
+    source_id: Optional[str] = None
     name: str
     source_type: str
     created_at: datetime
@@ -48,3 +49,14 @@ class SourceListItem(BaseModel):
 class IngestResponse(BaseModel):
     inserted: int
     source_type: str
+
+
+class SourceDeleteResponse(BaseModel):
+    source_id: str
+    deleted: int
+
+
+class SourceReindexResponse(BaseModel):
+    source_id: str
+    chunks: int
+    status: str
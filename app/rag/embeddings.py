@@ -1,11 +1,24 @@
 """Embedding utilities using an OpenAI-compatible API."""
 from __future__ import annotations
 
+import hashlib
 from typing import List
 
-from openai import OpenAI
-
 from app.core.config import settings
+from app.core.singleflight import SingleFlight
+
+_embed_flight = SingleFlight("embeddings", max_waiters=settings.coalesce_max_waiters)
+
+
+def _inputs_digest(texts: List[str]) -> str:
+    """Hash a batch of texts unambiguously by length-prefixing each one."""
+
+    digest = hashlib.sha1()
+    for text in texts:
+        data = text.encode("utf-8")
+        digest.update(f"{len(data)}:".encode("ascii"))
+        digest.update(data)
+    return digest.hexdigest()
 
 
 class EmbeddingClient:
@@ -15,12 +28,21 @@ class EmbeddingClient:
         self.model = model
         if not settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY is required for embeddings")
+        from openai import OpenAI
+
         self.client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_api_base)
 
     def embed(self, texts: List[str]) -> List[List[float]]:
-        """Create embeddings for a list of texts."""
+        """Create embeddings for a list of texts.
+
+        Identical concurrent inputs share a single upstream request.
+        """
 
         if not texts:
             return []
+        key = (self.model, len(texts), _inputs_digest(texts))
+        return _embed_flight.do(key, lambda: self._embed(texts))
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
         response = self.client.embeddings.create(model=self.model, input=texts)
         return [item.embedding for item in response.data]
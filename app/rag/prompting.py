@@ -0,0 +1,76 @@
+"""Prompt assembly tuned for provider-side prompt caching.
+
+Providers cache on exact prompt prefixes, so everything that repeats across
+queries (system prompt, context chunks) is emitted first in a canonical order
+and the volatile question text goes last.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+SYSTEM_PROMPT = (
+    "You are Company Knowledge Copilot. Answer with only the provided context."
+    " Cite sources inline using (Source N). If unsure, say you do not know."
+    " Provide a concise answer with citations."
+)
+
+
+def chunk_key(doc: Dict[str, str]) -> str:
+    """Stable key for a retrieved chunk, independent of its retrieval score."""
+
+    return hashlib.sha1(doc.get("text", "").encode("utf-8")).hexdigest()
+
+
+class PromptBuilder:
+    """Builds chat messages with a deterministic, cache-friendly prefix."""
+
+    def __init__(
+        self,
+        system_prompt: str = SYSTEM_PROMPT,
+        *,
+        hot_threshold: int = 3,
+        max_tracked: int = 10_000,
+    ) -> None:
+        self.system_prompt = system_prompt
+        self.hot_threshold = hot_threshold
+        self.max_tracked = max_tracked
+        # LRU of chunk key -> hit count; chunks not retrieved recently are forgotten.
+        self._hits: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def order(self, docs: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Return docs in canonical order: frequently retrieved chunks first, then the rest.
+
+        Within each group chunks are sorted by their content key, so the same set of
+        chunks always yields the same prompt regardless of score order.
+        """
+
+        keyed = [(chunk_key(doc), doc) for doc in docs]
+        with self._lock:
+            for key, _ in keyed:
+                self._hits[key] = self._hits.get(key, 0) + 1
+                self._hits.move_to_end(key)
+            while len(self._hits) > self.max_tracked:
+                self._hits.popitem(last=False)
+            hot = {key for key, _ in keyed if self._hits.get(key, 0) >= self.hot_threshold}
+        keyed.sort(key=lambda item: (item[0] not in hot, item[0]))
+        return [doc for _, doc in keyed]
+
+    def build_context(self, ordered_docs: List[Dict[str, str]]) -> str:
+        """Join docs already in canonical order, labelling each `(Source N)`.
+
+        Callers must list response sources in the same order so citations line up.
+        """
+
+        return "\n---\n".join(
+            f"(Source {idx})\n{doc.get('text', '')}" for idx, doc in enumerate(ordered_docs, start=1)
+        )
+
+    def build_messages(self, question: str, context: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {question}"},
+        ]
@@ -1,7 +1,7 @@
 """Retrieval and context building utilities."""
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Any, List, Mapping, Optional
 
 from app.core.config import settings
 from app.rag.vectorstore import VectorStore
@@ -13,13 +13,25 @@ class Retriever:
     def __init__(self, store: Optional[VectorStore] = None) -> None:
         self.store = store or VectorStore()
 
-    def fetch(self, query: str, *, k: int = settings.top_k, source_filter: Optional[str] = None) -> List[Dict[str, str]]:
+    def fetch(
+        self, query: str, *, k: int = settings.top_k, source_filter: Optional[str] = None
+    ) -> List[Mapping[str, Any]]:
+        """Return the top-k chunks for a query.
+
+        Results are read-only mappings shared with the retrieval cache; copy one with
+        `dict(doc)` before modifying it.
+        """
+
         where = {"source_type": source_filter} if source_filter else None
         return self.store.similarity_search(query, k=k, where=where)
 
-    def build_context(self, docs: List[Dict[str, str]], *, max_chars: int = settings.max_context_chars) -> str:
+    def select_context(
+        self, docs: List[Mapping[str, Any]], *, max_chars: int = settings.max_context_chars
+    ) -> List[Mapping[str, Any]]:
+        """Return the deduplicated, relevance-ordered docs that fit the context budget."""
+
         seen = set()
-        context_parts: List[str] = []
+        selected: List[Mapping[str, Any]] = []
         total = 0
         for doc in docs:
             snippet = doc.get("text", "")
@@ -27,7 +39,11 @@ class Retriever:
                 continue
             if total + len(snippet) > max_chars:
                 break
-            context_parts.append(snippet)
+            selected.append(doc)
             seen.add(snippet)
             total += len(snippet)
-        return "\n---\n".join(context_parts)
+        return selected
+
+    def build_context(self, docs: List[Mapping[str, Any]], *, max_chars: int = settings.max_context_chars) -> str:
+        selected = self.select_context(docs, max_chars=max_chars)
+        return "\n---\n".join(doc.get("text", "") for doc in selected)
@@ -1,37 +1,236 @@
 """Vector store abstraction using ChromaDB."""
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
 import os
+import threading
+import time
 import uuid
-from typing import Dict, List, Optional, Sequence
-
-import chromadb
-from chromadb.config import Settings as ChromaSettings
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from urllib.parse import urlparse
 
 from app.core.config import settings
+from app.core.metrics import metrics
+
 
+logger = logging.getLogger(__name__)
 
 Metadata = Dict[str, str]
 
+# Collection metadata key holding a token that every write replaces, so processes
+# sharing a Chroma server can tell when their cached results went stale.
+GENERATION_MARKER_KEY = "generation_marker"
+# Set once the legacy source-id backfill has run against a collection.
+BACKFILL_DONE_KEY = "source_ids_backfilled"
+
+
+def make_source_id(source_type: str, locator: str) -> str:
+    """Return a stable identifier for a source (same type + name => same id)."""
+
+    digest = hashlib.sha1(f"{source_type}:{locator}".encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+def legacy_source_id(meta: Metadata) -> str:
+    """Derive the id a chunk stored before source ids existed would have been given.
+
+    Legacy MCP chunks only recorded the file's basename, so a nested file such as
+    `docs/README.md` is backfilled with the id of `README.md`. The next sync keys it
+    by its mirror-relative path and does not replace those chunks; they have to be
+    removed once through `DELETE /api/sources/{id}`. Matching by basename during sync
+    is not safe because it would also hit a root-level file of the same name.
+    """
+
+    source_type = meta.get("source_type", "unknown")
+    if source_type == "mcp-github":
+        locator = f"{meta.get('url', '')}/{meta.get('file_name', '')}"
+    else:
+        locator = meta.get("file_name") or meta.get("url") or ""
+    return make_source_id(source_type, locator)
+
+
+class ChunkRecord:
+    """Interned chunk payload shared by every cached result that references it."""
+
+    __slots__ = ("id", "text", "metadata", "__weakref__")
+
+    def __init__(self, id: str, text: str, metadata: Metadata) -> None:
+        self.id = id
+        self.text = text
+        self.metadata = metadata
+
+
+class ScoredChunk(Mapping):
+    """Read-only mapping view of a retrieved chunk: text, metadata and score."""
+
+    __slots__ = ("record", "score")
+
+    def __init__(self, record: ChunkRecord, score: float) -> None:
+        self.record = record
+        self.score = score
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "text":
+            return self.record.text
+        if key == "score":
+            return self.score
+        return self.record.metadata[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield "text"
+        for key in self.record.metadata:
+            if key not in ("text", "score"):
+                yield key
+        yield "score"
+
+    def __len__(self) -> int:
+        return 2 + sum(1 for key in self.record.metadata if key not in ("text", "score"))
+
+
+class _IndexState:
+    """Per-collection generation counter, result cache and chunk pool.
+
+    The generation is bumped on every local write and whenever the shared marker
+    in the collection metadata changes; cached results are keyed by it and also
+    expire after `retrieval_cache_ttl`.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # Serialises writes with compaction, which swaps the live collection.
+        self.write_lock = threading.RLock()
+        self.collection: Any = None
+        self.pending_deletes = 0
+        self.generation = 0
+        self.marker: Optional[str] = None
+        self.marker_checked_at = 0.0
+        self.results: "OrderedDict[tuple, Tuple[float, Tuple[ScoredChunk, ...]]]" = OrderedDict()
+        self.pool: "weakref.WeakValueDictionary[str, ChunkRecord]" = weakref.WeakValueDictionary()
+
+    def bump(self, marker: Optional[str] = None) -> None:
+        with self.lock:
+            if marker is not None:
+                self.marker = marker
+            self.generation += 1
+            self.results.clear()
+            self.pool.clear()
+
+    def get(self, key: tuple) -> Optional[Tuple[ScoredChunk, ...]]:
+        with self.lock:
+            entry = self.results.get(key)
+            if entry is None:
+                return None
+            expires_at, hit = entry
+            if expires_at <= time.monotonic():
+                del self.results[key]
+                return None
+            self.results.move_to_end(key)
+            return hit
+
+    def put(self, key: tuple, value: Tuple[ScoredChunk, ...]) -> None:
+        with self.lock:
+            if key[-1] != self.generation:
+                return
+            self.results[key] = (time.monotonic() + settings.retrieval_cache_ttl, value)
+            self.results.move_to_end(key)
+            while len(self.results) > settings.retrieval_cache_size:
+                self.results.popitem(last=False)
+
+    def intern(self, chunk_id: str, text: str, metadata: Metadata) -> ChunkRecord:
+        with self.lock:
+            record = self.pool.get(chunk_id)
+            if record is None:
+                record = ChunkRecord(chunk_id, text, metadata)
+                self.pool[chunk_id] = record
+            return record
+
+
+_index_states: Dict[str, _IndexState] = {}
+_index_states_lock = threading.Lock()
+
+
+def _index_state(collection: str) -> _IndexState:
+    with _index_states_lock:
+        return _index_states.setdefault(collection, _IndexState())
+
 
 class VectorStore:
     """Wrapper around Chroma collections for similarity search."""
 
     def __init__(self, collection: str = "company-knowledge") -> None:
+        # chromadb is heavy to import; defer it until a store is actually needed.
+        import chromadb
+        from chromadb.config import Settings as ChromaSettings
+
+        self.name = collection
+        self.persist_dir: Optional[str] = None
         if settings.vector_db_url:
             parsed = urlparse(settings.vector_db_url)
             client = chromadb.HttpClient(host=parsed.hostname or settings.vector_db_url, port=parsed.port or 8000, ssl=parsed.scheme == "https")
         else:
             persist_dir = settings.vector_db_path
             os.makedirs(persist_dir, exist_ok=True)
-            client = chromadb.Client(
-                ChromaSettings(
-                    persist_directory=persist_dir,
-                    chroma_api_impl="chromadb.api.local.LocalAPI",
-                )
+            self.persist_dir = persist_dir
+            client = chromadb.PersistentClient(
+                path=persist_dir, settings=ChromaSettings(anonymized_telemetry=False)
             )
-        self.collection = client.get_or_create_collection(collection)
+        self._client = client
+        self._state = _index_state(collection)
+        with self._state.write_lock:
+            if self._state.collection is None:
+                self._state.collection = client.get_or_create_collection(collection)
+
+    @property
+    def collection(self) -> Any:
+        """The live Chroma collection, shared by every store in this process."""
+
+        return self._state.collection
+
+    @property
+    def generation(self) -> int:
+        """Monotonic counter bumped on every write seen by this process."""
+
+        return self._state.generation
+
+    def _update_collection_metadata(self, updates: Metadata) -> bool:
+        """Merge `updates` into the shared collection metadata; False if that is unsafe."""
+
+        metadata = dict(self._client.get_collection(self.name).metadata or {})
+        if "hnsw:space" in metadata:
+            # Chroma refuses metadata updates that carry the distance function and
+            # replaces metadata wholesale, so nothing can be merged in safely.
+            return False
+        metadata.update(updates)
+        self.collection.modify(metadata=metadata)
+        return True
+
+    def _mark_write(self) -> None:
+        """Bump the local generation and publish a new shared marker for other processes."""
+
+        marker = uuid.uuid4().hex
+        if self._update_collection_metadata({GENERATION_MARKER_KEY: marker}):
+            self._state.bump(marker)
+        else:
+            self._state.bump()
+
+    def _refresh_generation(self) -> None:
+        """Pick up writes from other processes, checking the shared marker at most
+        once per `retrieval_generation_check_interval`."""
+
+        state = self._state
+        now = time.monotonic()
+        if now - state.marker_checked_at < settings.retrieval_generation_check_interval:
+            return
+        state.marker_checked_at = now
+        metadata = self._client.get_collection(self.name).metadata or {}
+        marker = metadata.get(GENERATION_MARKER_KEY)
+        if marker != state.marker:
+            state.bump(marker)
 
     def add_texts(
         self,
@@ -42,27 +241,46 @@ class VectorStore:
         """Insert documents with metadata and return generated ids."""
 
         ids = [str(uuid.uuid4()) for _ in texts]
-        self.collection.add(
-            documents=list(texts),
-            metadatas=list(metadatas),
-            embeddings=list(embeddings) if embeddings is not None else None,
-            ids=ids,
-        )
+        with self._state.write_lock:
+            self.collection.add(
+                documents=list(texts),
+                metadatas=list(metadatas),
+                embeddings=list(embeddings) if embeddings is not None else None,
+                ids=ids,
+            )
+            self._mark_write()
         return ids
 
     def similarity_search(
         self, query: str, k: int = 4, where: Optional[Dict[str, str]] = None
-    ) -> List[Dict[str, str]]:
-        """Return top-k documents with metadata and scores."""
+    ) -> List[ScoredChunk]:
+        """Return top-k documents with metadata and scores.
+
+        Results are cached per (query, k, filter, index generation) and share
+        interned chunk records, so repeat retrievals skip Chroma entirely.
+        """
+
+        self._refresh_generation()
+        query_hash = hashlib.sha1(query.encode("utf-8")).hexdigest()
+        where_key = json.dumps(where, sort_keys=True) if where else ""
+        key = (query_hash, k, where_key, self._state.generation)
+        cached = self._state.get(key)
+        if cached is not None:
+            metrics.incr("retrieval.cache_hits")
+            return list(cached)
+        metrics.incr("retrieval.cache_misses")
 
         results = self.collection.query(query_texts=[query], n_results=k, where=where)
-        docs: List[Dict[str, str]] = []
-        for doc, meta, score in zip(
+        docs: List[ScoredChunk] = []
+        for chunk_id, doc, meta, score in zip(
+            results.get("ids", [[]])[0],
             results.get("documents", [[]])[0],
             results.get("metadatas", [[]])[0],
             results.get("distances", [[]])[0],
         ):
-            docs.append({"text": doc, **(meta or {}), "score": score})
+            record = self._state.intern(chunk_id, doc, meta or {})
+            docs.append(ScoredChunk(record, score))
+        self._state.put(key, tuple(docs))
         return docs
 
     def list_sources(self) -> List[Dict[str, str]]:
@@ -75,3 +293,166 @@ class VectorStore:
         for meta in all_metadatas:
             summary.append(meta or {})
         return summary
+
+    def get_source(self, source_id: str) -> Tuple[List[str], List[Metadata]]:
+        """Return all chunk texts and metadata stored for a source."""
+
+        results = self.collection.get(
+            where={"source_id": source_id}, include=["documents", "metadatas"]
+        )
+        documents = results.get("documents") or []
+        metadatas = [meta or {} for meta in results.get("metadatas") or []]
+        return documents, metadatas
+
+    def delete_source(self, source_id: str, *, batch_size: int = settings.delete_batch_size) -> int:
+        """Delete every chunk of a source in bounded batches and return the count."""
+
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        deleted = 0
+        with self._state.write_lock:
+            while True:
+                batch = self.collection.get(
+                    where={"source_id": source_id}, limit=batch_size, include=[]
+                )
+                ids = batch.get("ids") or []
+                if not ids:
+                    break
+                self.collection.delete(ids=ids)
+                deleted += len(ids)
+            if deleted:
+                self._state.pending_deletes += deleted
+                self._mark_write()
+        return deleted
+
+    def replace_sources(
+        self,
+        source_ids: Iterable[str],
+        texts: Sequence[str],
+        metadatas: Sequence[Metadata],
+        embeddings: Optional[Sequence[Sequence[float]]] = None,
+    ) -> List[str]:
+        """Add new chunks, then delete the chunks previously stored for `source_ids`.
+
+        The old chunk ids are captured before the add and only those are deleted
+        afterwards, so a failed add leaves the previous version in place and readers
+        never observe a source with no chunks.
+        """
+
+        with self._state.write_lock:
+            old_ids: List[str] = []
+            for source_id in dict.fromkeys(source_ids):
+                result = self.collection.get(where={"source_id": source_id}, include=[])
+                old_ids.extend(result.get("ids") or [])
+            new_ids = self.add_texts(texts, metadatas=metadatas, embeddings=embeddings)
+            batch_size = settings.delete_batch_size
+            for start in range(0, len(old_ids), batch_size):
+                self.collection.delete(ids=old_ids[start : start + batch_size])
+            if old_ids:
+                self._state.pending_deletes += len(old_ids)
+                self._mark_write()
+        return new_ids
+
+    def backfill_source_ids(self, *, batch_size: int = settings.delete_batch_size) -> int:
+        """Assign source ids to chunks indexed before they existed; return the count.
+
+        This is a one-off migration: completion is recorded in the collection
+        metadata, so later starts of this or any other replica skip the scan.
+        Writes are only held off while each batch is updated.
+        """
+
+        if (self._client.get_collection(self.name).metadata or {}).get(BACKFILL_DONE_KEY):
+            return 0
+        updated = 0
+        offset = 0
+        while True:
+            batch = self.collection.get(limit=batch_size, offset=offset, include=["metadatas"])
+            ids = batch.get("ids") or []
+            if not ids:
+                break
+            offset += len(ids)
+            missing = [
+                (chunk_id, meta or {})
+                for chunk_id, meta in zip(ids, batch.get("metadatas") or [])
+                if not (meta or {}).get("source_id")
+            ]
+            if not missing:
+                continue
+            with self._state.write_lock:
+                self.collection.update(
+                    ids=[chunk_id for chunk_id, _ in missing],
+                    metadatas=[{**meta, "source_id": legacy_source_id(meta)} for _, meta in missing],
+                )
+            updated += len(missing)
+        with self._state.write_lock:
+            if updated:
+                self._mark_write()
+            if not self._update_collection_metadata({BACKFILL_DONE_KEY: True}):
+                logger.warning("Cannot record source-id backfill on %s; it will rerun", self.name)
+        return updated
+
+    def compact(self) -> bool:
+        """Rebuild the embedded collection to reclaim space held by deleted chunks.
+
+        Chroma only tombstones deletes in its HNSW index and has no compaction API,
+        so live records are copied into a fresh collection that then takes over the
+        name. Writes in this process wait for the swap. Remote servers manage their
+        own storage and are left alone.
+        """
+
+        if not self.persist_dir:
+            return False
+        scratch = f"{self.name}-compacting"
+        retired = f"{self.name}-retired"
+        with self._state.write_lock:
+            old = self.collection
+            for stale in (scratch, retired):
+                try:
+                    self._client.delete_collection(stale)
+                except ValueError:
+                    pass
+            new = self._client.create_collection(scratch, metadata=old.metadata or None)
+            offset = 0
+            while True:
+                batch = old.get(
+                    limit=settings.delete_batch_size,
+                    offset=offset,
+                    include=["documents", "metadatas", "embeddings"],
+                )
+                ids = batch.get("ids") or []
+                if not ids:
+                    break
+                new.add(
+                    ids=ids,
+                    documents=batch["documents"],
+                    metadatas=batch["metadatas"],
+                    embeddings=batch["embeddings"],
+                )
+                offset += len(ids)
+            old.modify(name=retired)
+            new.modify(name=self.name)
+            self._state.collection = new
+            self._client.delete_collection(retired)
+            self._state.pending_deletes = 0
+            self._state.bump()
+        return True
+
+
+def maintain_indexes() -> int:
+    """Compact every collection with enough accumulated deletes; return how many ran."""
+
+    compacted = 0
+    with _index_states_lock:
+        due = [
+            name
+            for name, state in _index_states.items()
+            if state.pending_deletes >= settings.index_maintenance_min_deletes
+        ]
+    for name in due:
+        try:
+            if VectorStore(name).compact():
+                compacted += 1
+                logger.info("Compacted vector store collection %s", name)
+        except Exception as exc:  # pragma: no cover - best effort
+            logger.warning("Compaction of %s failed: %s", name, exc)
+    return compacted
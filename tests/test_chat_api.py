@@ -47,3 +47,41 @@ def test_chat_endpoint(monkeypatch):
     assert len(data["sources"]) > 0
 
     app.dependency_overrides = {}
+
+
+def test_cached_prompt_tokens_reach_metrics():
+    from openai.types import CompletionUsage
+
+    from app.core.metrics import metrics
+
+    metrics.reset()
+    usage = CompletionUsage(
+        prompt_tokens=1200,
+        completion_tokens=50,
+        total_tokens=1250,
+        prompt_tokens_details={"cached_tokens": 1024},
+    )
+    chat_module._record_usage(usage)
+
+    data = TestClient(app).get("/metrics").json()
+    assert data["llm.prompt_tokens"] == 1200
+    assert data["llm.cached_prompt_tokens"] == 1024
+
+
+def test_sources_follow_context_citation_order(monkeypatch):
+    contexts = []
+
+    def capture_llm(question: str, context: str) -> str:
+        contexts.append(context)
+        return "see (Source 1)"
+
+    monkeypatch.setattr(chat_module, "_llm_generate", capture_llm)
+    monkeypatch.setattr(chat_module, "EmbeddingClient", DummyEmbedder)
+    app.dependency_overrides[VectorStore] = lambda: DummyStore()
+
+    response = TestClient(app).post("/api/chat", json={"message": "Which source?", "top_k": 2})
+    sources = response.json()["sources"]
+    for idx, source in enumerate(sources, start=1):
+        assert f"(Source {idx})\n{source['snippet']}" in contexts[0]
+
+    app.dependency_overrides = {}
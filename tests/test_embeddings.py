@@ -0,0 +1,7 @@
+from app.rag.embeddings import _inputs_digest
+
+
+def test_inputs_digest_is_unambiguous_with_nul_bytes():
+    assert _inputs_digest(["a\x00b", "c"]) != _inputs_digest(["a", "b\x00c"])
+    assert _inputs_digest(["ab", "c"]) != _inputs_digest(["a", "bc"])
+    assert _inputs_digest(["same"]) == _inputs_digest(["same"])
@@ -0,0 +1,35 @@
+from app.core.config import settings
+from app.mcp import github_tools
+
+
+class RecordingEmbedder:
+    def __init__(self):
+        self.batches = []
+
+    def embed(self, texts):
+        self.batches.append(len(texts))
+        return [[0.0, 0.0, 0.0] for _ in texts]
+
+
+class DummyStore:
+    def __init__(self):
+        self.added = []
+
+    def replace_sources(self, source_ids, texts, metadatas, embeddings=None):
+        self.added.extend(texts)
+        return list(range(len(texts)))
+
+
+def test_large_file_is_embedded_in_bounded_batches(tmp_path, monkeypatch):
+    (tmp_path / "big.md").write_text("word " * 2000, encoding="utf-8")
+    monkeypatch.setattr(settings, "mcp_server_config", str(tmp_path))
+    monkeypatch.setattr(settings, "chunk_size", 100)
+    monkeypatch.setattr(settings, "chunk_overlap", 0)
+    monkeypatch.setattr(settings, "embed_batch_size", 16)
+    embedder = RecordingEmbedder()
+    store = DummyStore()
+
+    total = github_tools.sync_github_repo("https://example.com/repo", store, embedder)
+    assert total == len(store.added) == 100
+    assert max(embedder.batches) <= 16
+    assert sum(embedder.batches) == 100
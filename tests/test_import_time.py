@@ -0,0 +1,42 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+# Cumulative import budget for `app.main`, in microseconds. This is a loose
+# ceiling that tolerates slow runners; the HEAVY_MODULES check is what guards
+# the lazy imports.
+IMPORT_BUDGET_US = 1_000_000
+HEAVY_MODULES = ("chromadb", "openai", "pypdf", "docx2txt", "bs4")
+
+
+@pytest.fixture(scope="module")
+def app_import():
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+
+
+def test_app_import_defers_heavy_dependencies(app_import):
+    assert app_import.stdout.strip() == ""
+
+
+def test_app_import_within_budget(app_import):
+    cumulative = None
+    for line in app_import.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == "app.main":
+            cumulative = int(parts[1])
+    assert cumulative is not None
+    assert cumulative < IMPORT_BUDGET_US
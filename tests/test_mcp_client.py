@@ -0,0 +1,50 @@
+from app.mcp.client import MCPClient
+
+
+def test_scanner_applies_globs_size_limit_and_pruning(tmp_path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "guide.md").write_text("guide", encoding="utf-8")
+    (tmp_path / "README.MD").write_text("readme", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("x" * 100, encoding="utf-8")
+    (tmp_path / "script.py").write_text("print()", encoding="utf-8")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.md").write_text("dep", encoding="utf-8")
+
+    client = MCPClient(str(tmp_path), max_file_bytes=50)
+    names = sorted(path.name for path in client.iter_assets())
+    assert names == ["README.MD", "guide.md"]
+
+
+def test_reads_stream_every_asset(tmp_path):
+    for idx in range(20):
+        (tmp_path / f"doc{idx}.md").write_text(f"content {idx}", encoding="utf-8")
+
+    client = MCPClient(str(tmp_path), read_workers=2)
+    assets = dict(client.iter_markdown_assets())
+    assert len(assets) == 20
+    assert assets["doc7.md"] == "content 7"
+
+
+def test_missing_mirror_yields_nothing(tmp_path):
+    assert MCPClient(str(tmp_path / "missing")).fetch_markdown_assets() == []
+
+
+def test_assets_are_named_by_path_relative_to_mirror(tmp_path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "README.md").write_text("root", encoding="utf-8")
+    (tmp_path / "docs" / "README.md").write_text("nested", encoding="utf-8")
+
+    assets = dict(MCPClient(str(tmp_path)).iter_markdown_assets())
+    assert assets == {"README.md": "root", "docs/README.md": "nested"}
+
+
+def test_read_asset_refuses_paths_outside_mirror(tmp_path):
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    (mirror / "a.md").write_text("inside", encoding="utf-8")
+    (tmp_path / "secret.md").write_text("outside", encoding="utf-8")
+
+    client = MCPClient(str(mirror))
+    assert client.read_asset("a.md") == "inside"
+    assert client.read_asset("../secret.md") is None
+    assert client.read_asset("missing.md") is None
@@ -0,0 +1,36 @@
+from app.rag.prompting import PromptBuilder
+
+
+def test_context_order_is_independent_of_score_order():
+    docs = [{"text": "alpha"}, {"text": "beta"}, {"text": "gamma"}]
+    builder = PromptBuilder(hot_threshold=100)
+    assert builder.order(docs) == builder.order(list(reversed(docs)))
+
+
+def test_context_labels_follow_given_order():
+    builder = PromptBuilder()
+    context = builder.build_context([{"text": "beta"}, {"text": "alpha"}])
+    assert context == "(Source 1)\nbeta\n---\n(Source 2)\nalpha"
+
+
+def test_hot_chunks_lead_the_context():
+    builder = PromptBuilder(hot_threshold=2)
+    hot = {"text": "frequently retrieved"}
+    builder.order([hot])
+    ordered = builder.order([{"text": "a"}, {"text": "b"}, hot])
+    assert ordered[0] is hot
+
+
+def test_question_comes_after_context():
+    builder = PromptBuilder()
+    messages = builder.build_messages("What is the policy?", "policy content")
+    assert messages[0]["role"] == "system"
+    user = messages[1]["content"]
+    assert user.index("policy content") < user.index("What is the policy?")
+
+
+def test_hit_tracking_is_bounded():
+    builder = PromptBuilder(max_tracked=5)
+    for idx in range(20):
+        builder.order([{"text": f"chunk {idx}"}])
+    assert len(builder._hits) == 5
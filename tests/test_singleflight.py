@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.singleflight import AsyncSingleFlight, CoalescingOverflowError, SingleFlight
+
+
+def test_threaded_calls_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.05)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+
+
+def test_async_calls_share_one_execution_and_overflow():
+    flight = AsyncSingleFlight("test", max_waiters=2)
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        waiters = [asyncio.ensure_future(flight.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(CoalescingOverflowError):
+            await flight.do("key", work)
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(main()) == ["result", "result"]
+    assert len(calls) == 1
+
+
+def test_async_cancelled_waiter_does_not_cancel_others():
+    flight = AsyncSingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("key", work))
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "result"
+
+
+def test_async_late_joiner_after_cancellation_starts_fresh():
+    flight = AsyncSingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        only = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        only.cancel()
+        await asyncio.sleep(0)
+        return await flight.do("key", work)
+
+    assert asyncio.run(main()) == "result"
@@ -0,0 +1,124 @@
+import pytest
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.api import sources as sources_module
+from app.rag.vectorstore import VectorStore
+
+
+class DummyStore:
+    def __init__(self):
+        self.chunks = {
+            "a": ("first chunk", {"source_id": "src-1", "source_type": "file", "file_name": "handbook.pdf"}),
+            "b": ("second chunk", {"source_id": "src-1", "source_type": "file", "file_name": "handbook.pdf"}),
+            "c": ("other", {"source_id": "src-2", "source_type": "file", "file_name": "faq.md"}),
+        }
+        self.added = 0
+
+    def get_source(self, source_id):
+        matches = [(doc, meta) for doc, meta in self.chunks.values() if meta["source_id"] == source_id]
+        return [doc for doc, _ in matches], [meta for _, meta in matches]
+
+    def delete_source(self, source_id, batch_size=500):
+        ids = [key for key, (_, meta) in self.chunks.items() if meta["source_id"] == source_id]
+        for key in ids:
+            del self.chunks[key]
+        return len(ids)
+
+    def replace_sources(self, source_ids, texts, metadatas, embeddings=None):
+        old = [key for key, (_, meta) in self.chunks.items() if meta["source_id"] in source_ids]
+        for text, meta in zip(texts, metadatas):
+            self.added += 1
+            self.chunks[f"new-{self.added}"] = (text, meta)
+        for key in old:
+            del self.chunks[key]
+        return list(range(len(texts)))
+
+
+class DummyEmbedder:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def embed(self, texts):
+        return [[0.0 for _ in range(3)] for _ in texts]
+
+
+def test_delete_source_removes_chunks():
+    store = DummyStore()
+    app.dependency_overrides[VectorStore] = lambda: store
+
+    client = TestClient(app)
+    response = client.delete("/api/sources/src-1")
+    assert response.status_code == 200
+    assert response.json() == {"source_id": "src-1", "deleted": 2}
+    assert [meta["source_id"] for _, meta in store.chunks.values()] == ["src-2"]
+
+    assert client.delete("/api/sources/src-1").status_code == 404
+
+    app.dependency_overrides = {}
+
+
+def test_reindex_source_reembeds_stored_chunks(monkeypatch):
+    monkeypatch.setattr(sources_module, "EmbeddingClient", DummyEmbedder)
+    store = DummyStore()
+    app.dependency_overrides[VectorStore] = lambda: store
+
+    client = TestClient(app)
+    response = client.post("/api/sources/src-1/reindex")
+    assert response.status_code == 200
+    assert response.json()["chunks"] == 2
+    docs, _ = store.get_source("src-1")
+    assert sorted(docs) == ["first chunk", "second chunk"]
+
+    assert client.post("/api/sources/missing/reindex").status_code == 404
+
+    app.dependency_overrides = {}
+
+
+class FailingEmbedder(DummyEmbedder):
+    def embed(self, texts):
+        raise RuntimeError("rate limited")
+
+
+def test_failed_url_reindex_keeps_existing_chunks(monkeypatch):
+    async def fake_fetch(url):
+        return "fresh page content"
+
+    monkeypatch.setattr(sources_module, "EmbeddingClient", FailingEmbedder)
+    monkeypatch.setattr(sources_module, "_fetch_url", fake_fetch)
+    store = DummyStore()
+    store.chunks["d"] = ("page", {"source_id": "src-3", "source_type": "url", "url": "https://docs"})
+    app.dependency_overrides[VectorStore] = lambda: store
+
+    client = TestClient(app)
+    with pytest.raises(RuntimeError):
+        client.post("/api/sources/src-3/reindex")
+    docs, _ = store.get_source("src-3")
+    assert docs == ["page"]
+
+    app.dependency_overrides = {}
+
+
+def test_mcp_reindex_rereads_mirror_file(tmp_path, monkeypatch):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "guide.md").write_text("updated guide", encoding="utf-8")
+    monkeypatch.setattr(settings, "mcp_server_config", str(tmp_path))
+    monkeypatch.setattr(sources_module, "EmbeddingClient", DummyEmbedder)
+    store = DummyStore()
+    store.chunks["m"] = (
+        "stale guide",
+        {"source_id": "src-4", "source_type": "mcp-github", "file_name": "docs/guide.md", "url": "repo"},
+    )
+    app.dependency_overrides[VectorStore] = lambda: store
+
+    client = TestClient(app)
+    assert client.post("/api/sources/src-4/reindex").status_code == 200
+    assert store.get_source("src-4")[0] == ["updated guide"]
+
+    (tmp_path / "docs" / "guide.md").unlink()
+    assert client.post("/api/sources/src-4/reindex").status_code == 200
+    assert store.get_source("src-4")[0] == ["updated guide"]
+
+    app.dependency_overrides = {}
@@ -0,0 +1,85 @@
+import uuid
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from app.core.config import settings
+from app.rag.vectorstore import VectorStore, make_source_id
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "vector_db_url", "")
+    monkeypatch.setattr(settings, "vector_db_path", str(tmp_path))
+    return VectorStore(f"test-{uuid.uuid4().hex[:8]}")
+
+
+def _add(store, source_id, count):
+    store.add_texts(
+        [f"{source_id} chunk {idx}" for idx in range(count)],
+        metadatas=[{"source_id": source_id, "source_type": "file"} for _ in range(count)],
+        embeddings=[[float(idx), 1.0, 0.0] for idx in range(count)],
+    )
+
+
+def test_compact_keeps_live_records(store):
+    _add(store, "keep", 5)
+    _add(store, "drop", 5)
+    store.delete_source("drop")
+
+    assert store.compact()
+    assert store.collection.name == store.name
+    assert store.collection.count() == 5
+    docs, _ = store.get_source("keep")
+    assert len(docs) == 5
+    # A fresh store for the same collection sees the compacted collection.
+    assert VectorStore(store.name).collection.count() == 5
+
+
+def test_delete_source_spans_batches_and_spares_other_sources(store):
+    _add(store, "big", 12)
+    _add(store, "other", 3)
+
+    assert store.delete_source("big", batch_size=5) == 12
+    assert store.get_source("big") == ([], [])
+    docs, metadatas = store.get_source("other")
+    assert len(docs) == 3
+    assert all(meta["source_id"] == "other" for meta in metadatas)
+
+
+def test_backfill_assigns_ids_to_legacy_chunks(store):
+    store.collection.add(
+        ids=["legacy"],
+        documents=["old chunk"],
+        metadatas=[{"source_type": "file", "file_name": "handbook.pdf"}],
+        embeddings=[[0.0, 1.0, 0.0]],
+    )
+    _add(store, "new", 1)
+
+    assert store.backfill_source_ids() == 1
+    assert store.delete_source(make_source_id("file", "handbook.pdf")) == 1
+    assert store.collection.count() == 1
+
+
+def test_replace_sources_adds_before_deleting(store):
+    _add(store, "doc", 3)
+
+    with pytest.raises(Exception):
+        # A wrong-dimension embedding makes the add fail; the old chunks must survive.
+        store.replace_sources(["doc"], ["new"], [{"source_id": "doc"}], embeddings=[[1.0]])
+    assert len(store.get_source("doc")[0]) == 3
+
+    store.replace_sources(["doc"], ["new"], [{"source_id": "doc"}], embeddings=[[1.0, 1.0, 1.0]])
+    assert store.get_source("doc")[0] == ["new"]
+
+
+def test_backfill_runs_once_per_collection(store):
+    store.backfill_source_ids()
+    store.collection.add(
+        ids=["late"],
+        documents=["late chunk"],
+        metadatas=[{"source_type": "file", "file_name": "late.pdf"}],
+        embeddings=[[0.0, 1.0, 0.0]],
+    )
+    assert store.backfill_source_ids() == 0
@@ -0,0 +1,101 @@
+import uuid
+
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+
+from app.core.config import settings
+from app.rag.vectorstore import ScoredChunk, VectorStore
+
+
+class FakeCollection:
+    def __init__(self):
+        self.metadata = None
+        self.queries = 0
+        self.rows = {"c1": ("policy content", {"source_id": "s1", "source_type": "file"})}
+
+    def query(self, query_texts, n_results, where=None):
+        self.queries += 1
+        items = list(self.rows.items())[:n_results]
+        return {
+            "ids": [[key for key, _ in items]],
+            "documents": [[doc for _, (doc, _) in items]],
+            "metadatas": [[meta for _, (_, meta) in items]],
+            "distances": [[0.1 for _ in items]],
+        }
+
+    def add(self, documents, metadatas, embeddings, ids):
+        for key, doc, meta in zip(ids, documents, metadatas):
+            self.rows[key] = (doc, meta)
+
+    def modify(self, metadata):
+        self.metadata = metadata
+
+
+class FakeClient:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def get_or_create_collection(self, name):
+        return self.collection
+
+    def get_collection(self, name):
+        return self.collection
+
+
+@pytest.fixture
+def make_store(tmp_path, monkeypatch):
+    """Build real VectorStores whose Chroma client serves the given fake collection."""
+
+    monkeypatch.setattr(settings, "vector_db_url", "")
+    monkeypatch.setattr(settings, "vector_db_path", str(tmp_path))
+
+    def factory(collection=None):
+        collection = collection or FakeCollection()
+        monkeypatch.setattr(chromadb, "PersistentClient", lambda path, settings=None: FakeClient(collection))
+        return VectorStore(f"test-{uuid.uuid4().hex[:8]}")
+
+    return factory
+
+
+def test_repeat_search_is_served_from_cache(make_store):
+    store = make_store()
+    first = store.similarity_search("policy?", k=2)
+    second = store.similarity_search("policy?", k=2)
+    assert store.collection.queries == 1
+    assert dict(first[0]) == {"text": "policy content", "source_id": "s1", "source_type": "file", "score": 0.1}
+    assert isinstance(second[0], ScoredChunk)
+    assert second[0].record is first[0].record
+
+
+def test_write_bumps_generation_and_invalidates_cache(make_store):
+    store = make_store()
+    store.similarity_search("policy?", k=2)
+    generation = store.generation
+    store.add_texts(["new content"], metadatas=[{"source_id": "s2", "source_type": "url"}])
+    assert store.generation == generation + 1
+    results = store.similarity_search("policy?", k=2)
+    assert store.collection.queries == 2
+    assert [doc["text"] for doc in results] == ["policy content", "new content"]
+
+
+def test_write_from_another_process_invalidates_cache(make_store, monkeypatch):
+    monkeypatch.setattr(settings, "retrieval_generation_check_interval", 0.0)
+    reader = make_store()
+    writer = make_store(reader.collection)  # same collection, separate process state
+    reader.similarity_search("policy?", k=2)
+    reader.similarity_search("policy?", k=2)
+    assert reader.collection.queries == 1
+
+    writer.add_texts(["new content"], metadatas=[{"source_id": "s2", "source_type": "url"}])
+    results = reader.similarity_search("policy?", k=2)
+    assert reader.collection.queries == 2
+    assert len(results) == 2
+
+
+def test_cached_results_expire(make_store, monkeypatch):
+    monkeypatch.setattr(settings, "retrieval_cache_ttl", 0.0)
+    store = make_store()
+    store.similarity_search("policy?", k=2)
+    store.similarity_search("policy?", k=2)
+    assert store.collection.queries == 2